@@ -9,6 +9,10 @@ import os
 import sys
 import re
 
+# Precompiled patterns, reused for every page scanned
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_URL_RE = re.compile(r"^(http:\/\/www\.|https:\/\/www\.|http:\/\/|https:\/\/)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}")
+
 @dataclass
 class Business:
     name: str = None
@@ -46,10 +50,9 @@ def extract_coordinates_from_url(url: str) -> tuple[float, float]:
 
 def extract_email_from_rendered_text(page) -> str:
     """Looks for an email address in the rendered text content."""
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
     visible_text = page.inner_text("body")
-    emails = re.findall(email_pattern, visible_text)
-    return emails[0] if emails else None
+    match = _EMAIL_RE.search(visible_text)
+    return match.group(0) if match else None
 
 def perform_site_specific_google_search(search_page, website_url) -> str:
     """Performs a Google search for emails on a specific website using the address bar."""
@@ -104,8 +107,7 @@ def search_email_on_website(context, website_url) -> str:
 
 def is_valid_url(url: str) -> bool:
     """Checks if the URL has a valid domain format."""
-    url_pattern = r"^(http:\/\/www\.|https:\/\/www\.|http:\/\/|https:\/\/)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}"
-    return re.match(url_pattern, url) is not None
+    return _URL_RE.match(url) is not None
 
 def scroll_to_load_more(page, required_items, max_scrolls=10):
     """
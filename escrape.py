@@ -1,15 +1,76 @@
 # --------------------------------
 # Imports and Data Classes
 # --------------------------------
-from playwright.sync_api import sync_playwright
-from dataclasses import dataclass, asdict, field
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from selectolax.parser import HTMLParser
+from dataclasses import dataclass, field
 from pathlib import Path
-import pandas as pd
-import os
+from urllib.parse import urlparse
+from html import unescape
+from datetime import date
+from contextlib import closing
+from openpyxl import Workbook
+import csv
+import operator
+import sqlite3
 import re
+import re2
 import requests
 import json
 import random
+import asyncio
+import httpx
+
+# Precompiled patterns, reused for every page scanned.
+# The email patterns run over whole pages, so they use RE2 for linear-time matching without backtracking.
+_EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+_EMAIL_RE = re2.compile(_EMAIL_PATTERN)
+_MAILTO_RE = re2.compile(r'(?i:mailto:)\s*(' + _EMAIL_PATTERN + ')')
+_URL_RE = re.compile(r"^(http:\/\/www\.|https:\/\/www\.|http:\/\/|https:\/\/)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}")
+_SITEMAP_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>")
+_ROBOTS_SITEMAP_RE = re.compile(r"^\s*sitemap:\s*(\S+)", re.I | re.M)
+# A whole URL path segment naming a contact-like page, e.g. /contact, /pages/about-us, /impressum.html
+_CONTACT_SEGMENT_RE = re.compile(
+    r"(contact|contacts|about|support|help|impressum|imprint|kontakt|reach|get-in-touch)([-_](us|me))?(\.(html?|php|aspx?))?",
+    re.I,
+)
+
+# Google Maps selectors, CSS rather than XPath
+PLACES_CSS = 'a[href*="/maps/place"]'
+RESULTS_PANEL_CSS = 'div[aria-label*="Results for"]'
+
+# Number of boutique websites probed for emails at the same time
+MAX_CONCURRENCY = 5
+
+# Debug: print the IP address each browser is seen from, once per process
+DEBUG = False
+_IP_CHECKED = False
+
+# Pages with less visible body text than this are treated as rendered by JavaScript
+MIN_STATIC_BODY_TEXT = 200
+
+# Stop streaming a page over HTTP once this much of it has been read without finding an email
+MAX_STREAMED_CHARS = 400_000
+
+# Longest valid email address; a match this close to the end of a partial stream may still continue
+MAX_EMAIL_LENGTH = 254
+
+# "Top-level domains" that are really file extensions, as in retina image names like logo@2x.png
+ASSET_EXTENSIONS = ("png", "jpg", "jpeg", "gif", "svg", "webp", "css", "js")
+
+# Most contact-like pages taken from a site's sitemap before falling back to common paths
+MAX_SITEMAP_CANDIDATES = 5
+
+# Emails found per website domain, reused across suburbs (and worker processes) on the same day.
+# Lookups give up quickly when another worker holds the lock; a cache miss only costs a crawl.
+EMAIL_CACHE_PATH = "email_cache.db"
+EMAIL_CACHE_TIMEOUT = 2
+
+# Requests that never carry email text, aborted to cut page weight. Stylesheets are only blocked on
+# boutique websites: Google Maps needs them to lay out its scrollable results panel.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_LOCAL_RESOURCE_TYPES = BLOCKED_RESOURCE_TYPES | {"stylesheet"}
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "connect.facebook.net", "hotjar.com")
 
 
 @dataclass
@@ -22,39 +83,72 @@ class Business:
     latitude: float = None
     longitude: float = None
 
+# Field order of the output files, and a C-level getter returning those fields as one tuple
+_BIZ_FIELDS = list(Business.__dataclass_fields__)
+_BIZ_GET = operator.attrgetter(*_BIZ_FIELDS)
+
 @dataclass
 class BusinessList:
     business_list: list[Business] = field(default_factory=list)
     save_at = 'output'
 
-    def dataframe(self):
-        return pd.json_normalize((asdict(business) for business in self.business_list), sep="_")
+    def __post_init__(self):
+        Path(self.save_at).mkdir(parents=True, exist_ok=True)
+
+    def columns(self):
+        return {f: [getattr(business, f) for business in self.business_list] for f in _BIZ_FIELDS}
 
     def save_to_excel(self, filename):
-        if not os.path.exists(self.save_at):
-            os.makedirs(self.save_at)
-        self.dataframe().to_excel(f"{self.save_at}/{filename}.xlsx", index=False)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        sheet.append(_BIZ_FIELDS)
+        for business in self.business_list:
+            sheet.append(_BIZ_GET(business))
+        workbook.save(f"{self.save_at}/{filename}.xlsx")
 
     def save_to_csv(self, filename):
-        if not os.path.exists(self.save_at):
-            os.makedirs(self.save_at)
-        self.dataframe().to_csv(f"{self.save_at}/{filename}.csv", index=False)
+        columns = self.columns()
+        with open(f"{self.save_at}/{filename}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*columns.values()))
 
 # --------------------------------
 # Helper Functions
 # --------------------------------
 def extract_coordinates_from_url(url: str) -> tuple[float, float]:
-    coordinates = url.split('/@')[-1].split('/')[0]
-    return float(coordinates.split(',')[0]), float(coordinates.split(',')[1])
+    coordinates = url.rpartition('/@')[2].partition('/')[0]
+    latitude, _, rest = coordinates.partition(',')
+    longitude = rest.partition(',')[0]
+    return float(latitude), float(longitude)
+
+def block_heavy_resources(blocked_types):
+    """Builds a route handler that aborts the given resource types and analytics requests."""
+    async def handler(route):
+        host = urlparse(route.request.url).hostname or ""
+        if route.request.resource_type in blocked_types or host.endswith(BLOCKED_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+    return handler
+
+async def wait_loaded(page, timeout_ms=8000):
+    """Waits for the document to finish loading instead of sleeping for a fixed time."""
+    await page.wait_for_load_state("domcontentloaded")
+    try:
+        await page.wait_for_function("() => document.readyState === 'complete'", timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        print(f"Page still loading after {timeout_ms}ms, continuing: {page.url}")
 
-def extract_email_from_rendered_text(page) -> str:
+async def extract_email_from_rendered_text(page) -> str:
     """Looks for an email address in the rendered text content."""
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    visible_text = page.inner_text("body")
-    emails = re.findall(email_pattern, visible_text)
-    return emails[0] if emails else None
+    # Match inside the page so only the first email, not the whole body text, crosses back to Python
+    return await page.evaluate(
+        "(pattern) => { const m = document.body && document.body.innerText.match(new RegExp(pattern)); return m ? m[0] : null; }",
+        _EMAIL_PATTERN
+    )
 
-def perform_site_specific_google_search(search_page, website_url: str) -> str:
+async def perform_site_specific_google_search(search_page, website_url: str) -> str:
     """
     Performs a Google search for emails on a specific website using the address bar.
     Returns the first email found or None if no email is present.
@@ -67,13 +161,13 @@ def perform_site_specific_google_search(search_page, website_url: str) -> str:
     try:
         # Construct the site-specific query
         search_query = f"site:{website_url} email"
-        search_page.goto(f"https://www.google.com/search?q={search_query}", timeout=15000)  # Increased timeout
+        await search_page.goto(f"https://www.google.com/search?q={search_query}", timeout=15000)  # Increased timeout
 
         # Wait for the search results container to load
-        search_page.wait_for_selector('//div[@id="search"]', timeout=5000)  # Ensures the results container is present
+        await search_page.wait_for_selector('//div[@id="search"]', timeout=5000)  # Ensures the results container is present
 
         # Extract email from the rendered text of the search results
-        email_found = extract_email_from_rendered_text(search_page)
+        email_found = await extract_email_from_rendered_text(search_page)
         if email_found:
             print(f"Email found via Google search for {website_url}: {email_found}")
             return email_found
@@ -91,135 +185,321 @@ def perform_site_specific_google_search(search_page, website_url: str) -> str:
 
 
 
-def search_email_on_website(local_context, website_url,proxy_context) -> str:
+def is_plausible_email(candidate: str) -> bool:
+    """Rejects asset file names that happen to match the email pattern."""
+    return candidate.rpartition(".")[2].lower() not in ASSET_EXTENSIONS
+
+def find_mailto_email(source: str, start: int, end: int) -> str:
+    """Returns the first email from a mailto: link lying entirely within source[start:end]."""
+    for match in _MAILTO_RE.finditer(source, start):
+        if match.end() > end:
+            return None
+        if is_plausible_email(match.group(1)):
+            return match.group(1)
+    return None
+
+def find_email_in_visible_text(html: str, truncated: bool = False) -> str:
+    """
+    Looks for an email in the visible body text of raw HTML, skipping scripts and styles like innerText does.
+    When the HTML was cut off, a match running up to the end of the text may be cut short and is skipped.
+    """
+    tree = HTMLParser(html)
+    tree.strip_tags(["script", "style", "noscript"])
+    if tree.body is None:
+        return None
+    text = tree.body.text(separator="\n").rstrip()
+    for match in _EMAIL_RE.finditer(text):
+        if truncated and match.end() == len(text):
+            return None
+        if is_plausible_email(match.group(0)):
+            return match.group(0)
+    return None
+
+async def scan_page_source(http_client, url: str) -> tuple[str, str]:
+    """
+    Streams the raw HTML of a page without a browser and looks for an email where a visitor would see it:
+    in mailto: links while streaming (stopping at the first one), then in the visible body text.
+    Returns the email (or None) and the HTML read so far, which is empty on failure.
+    """
+    source = ""
+    scan_from = 0
+    complete = False
+    try:
+        async with http_client.stream("GET", url, timeout=8) as response:
+            async for chunk in response.aiter_text(chunk_size=16384):
+                source += chunk
+                # Only trust links that end before the tail; one running into it may continue in the next chunk
+                safe_end = len(source) - MAX_EMAIL_LENGTH
+                email_found = find_mailto_email(source, scan_from, safe_end)
+                if email_found:
+                    return email_found, source
+                scan_from = max(scan_from, safe_end - 2 * MAX_EMAIL_LENGTH)
+                if len(source) > MAX_STREAMED_CHARS:
+                    break
+            else:
+                complete = True
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+
+    # Unless the whole page arrived (size cap, timeout or dropped connection), a match running
+    # up to the end of what was read may be cut short, so it is refused like in the loop above
+    mailto_end = len(source) if complete else len(source) - 1
+    email_found = find_mailto_email(source, scan_from, mailto_end) or find_email_in_visible_text(source, not complete)
+    return email_found, source
+
+def looks_js_rendered(html: str) -> bool:
+    """Checks if a page needs JavaScript to render its content (e.g. Next.js apps or empty bodies)."""
+    if "__NEXT_DATA__" in html:
+        return True
+    body = HTMLParser(html).body
+    return body is None or len(body.text(strip=True)) < MIN_STATIC_BODY_TEXT
+
+def page_key(url: str) -> tuple[str, str]:
+    """Identifies a page regardless of scheme, a leading "www." or a trailing slash."""
+    parsed = urlparse(url)
+    return parsed.netloc.lower().removeprefix("www."), parsed.path.rstrip("/")
+
+def is_contact_page(url: str) -> bool:
+    """Checks if any segment of the URL's path (not its hostname) names a contact-like page."""
+    return any(_CONTACT_SEGMENT_RE.fullmatch(segment) for segment in urlparse(url).path.split("/"))
+
+async def fetch_sitemap_urls(http_client, sitemap_url: str) -> list[str]:
+    """Returns the <loc> URLs listed in a sitemap."""
+    response = await http_client.get(sitemap_url, timeout=5)
+    response.raise_for_status()
+    return [unescape(u) for u in _SITEMAP_LOC_RE.findall(response.text)]
+
+async def find_sitemap_contact_urls(http_client, website_url: str) -> list[str]:
+    """
+    Reads the site's /sitemap.xml, or the sitemaps declared in /robots.txt if that is missing,
+    and returns the URLs that look like contact or about pages.
+    Sitemap indexes (as served by Shopify and WordPress) are followed one level into their page sitemaps.
+    """
+    urls = []
+    try:
+        urls = await fetch_sitemap_urls(http_client, f"{website_url.rstrip('/')}/sitemap.xml")
+    except Exception as e:
+        print(f"Sitemap not available for {website_url}: {e}")
+
+    if not urls:
+        # Sites with a non-default sitemap location declare it in robots.txt
+        try:
+            response = await http_client.get(f"{website_url.rstrip('/')}/robots.txt", timeout=5)
+            response.raise_for_status()
+            robots_sitemaps = _ROBOTS_SITEMAP_RE.findall(response.text)
+        except Exception as e:
+            print(f"robots.txt not available for {website_url}: {e}")
+            robots_sitemaps = []
+        for sitemap_url in robots_sitemaps[:2]:
+            try:
+                urls += await fetch_sitemap_urls(http_client, sitemap_url)
+            except Exception as e:
+                print(f"Sitemap not available at {sitemap_url}: {e}")
+
+    child_sitemaps = [u for u in urls if urlparse(u).path.endswith(".xml") and "page" in u.lower()]
+    for child_sitemap in child_sitemaps[:2]:
+        # A broken child sitemap shouldn't discard what the others already found
+        try:
+            urls += await fetch_sitemap_urls(http_client, child_sitemap)
+        except Exception as e:
+            print(f"Child sitemap not available at {child_sitemap}: {e}")
+    pages = [u for u in urls if not urlparse(u).path.endswith(".xml")]
+    return [u for u in pages if is_contact_page(u)][:MAX_SITEMAP_CANDIDATES]
+
+def open_email_cache() -> sqlite3.Connection:
+    """Opens a connection to the email cache, creating the table if needed."""
+    cache = sqlite3.connect(EMAIL_CACHE_PATH, timeout=EMAIL_CACHE_TIMEOUT)
+    cache.execute("CREATE TABLE IF NOT EXISTS emails (key TEXT PRIMARY KEY, email TEXT)")
+    return cache
+
+def read_cached_email(cache_key: str) -> str:
+    """Returns the cached email for the key, or None. Blocking; run it off the event loop."""
+    try:
+        with closing(open_email_cache()) as cache:
+            row = cache.execute("SELECT email FROM emails WHERE key = ?", (cache_key,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"Email cache lookup failed for {cache_key}: {e}")
+        return None
+    return row[0] if row else None
+
+def write_cached_email(cache_key: str, email: str):
+    """Stores an email found for the key. Blocking; run it off the event loop."""
+    try:
+        with closing(open_email_cache()) as cache, cache:
+            cache.execute("INSERT OR REPLACE INTO emails (key, email) VALUES (?, ?)", (cache_key, email))
+    except sqlite3.Error as e:
+        print(f"Email cache write failed for {cache_key}: {e}")
+
+async def search_email_on_website(local_context, website_url, proxy_context, http_client) -> str:
+    """
+    Returns the email for the boutique's website, reusing today's result if one was already found for the domain.
+    Franchises and shared hosts often show up in several nearby suburbs.
+    """
+    domain = urlparse(website_url).netloc.lower().removeprefix("www.")
+    cache_key = f"{domain}:{date.today().isoformat()}"
+    cached_email = await asyncio.to_thread(read_cached_email, cache_key)
+    if cached_email:
+        print(f"Using cached email for {domain}: {cached_email}")
+        return cached_email
+
+    email_found = await find_email_on_website(local_context, website_url, proxy_context, http_client)
+    # Only found emails are cached: a miss may come from a timeout or a blocked Google search
+    if email_found:
+        await asyncio.to_thread(write_cached_email, cache_key, email_found)
+    return email_found
+
+async def find_email_on_website(local_context, website_url, proxy_context, http_client) -> str:
     """Attempts to find an email on the boutique's website, with a fallback Google search if none found."""
-    search_page = local_context.new_page()
     common_contact_paths = ["/about", "/contact", "/about-us", "/contact-us", "/support", "/help", "/get-in-touch"]
 
+    # Step 1: Scan the raw HTML over plain HTTP; a miss is only conclusive on static pages
+    print(f"Fetching main page over HTTP: {website_url}")
+    email_found, html = await scan_page_source(http_client, website_url)
+    if email_found:
+        print(f"Email found directly on {website_url}: {email_found}")
+        return email_found
+    is_static = bool(html) and not looks_js_rendered(html)
+
+    # Contact pages listed in the sitemap are tried before guessing the common paths
+    contact_urls = []
+    seen_pages = set()
+    sitemap_urls = await find_sitemap_contact_urls(http_client, website_url)
+    for full_url in sitemap_urls + [f"{website_url.rstrip('/')}{path}" for path in common_contact_paths]:
+        if page_key(full_url) not in seen_pages:
+            seen_pages.add(page_key(full_url))
+            contact_urls.append(full_url)
+
+    if is_static:
+        for full_url in contact_urls:
+            print(f"Fetching over HTTP: {full_url}")
+            email_found, _ = await scan_page_source(http_client, full_url)
+            if email_found:
+                print(f"Email found on {full_url}: {email_found}")
+                return email_found
+
+    search_page = await local_context.new_page()
     try:
-        # Step 1: Check the main page for an email
+        # Step 2: Check the main page for an email in the browser
         print(f"Visiting main page: {website_url}")
         #search_page.goto(website_url, timeout=31234)
         #search_page.wait_for_timeout(2000)  # Wait for page load
         #use the following two lines as i don't need to be sealthy on boutique's website
-        search_page.goto(website_url,timeout=30000)
-        search_page.wait_for_load_state("domcontentloaded")  # Wait for the page to fully load
-        email_found = extract_email_from_rendered_text(search_page)
+        await search_page.goto(website_url,timeout=30000)
+        await wait_loaded(search_page)  # Wait for the page to fully load
+        email_found = await extract_email_from_rendered_text(search_page)
         if email_found:
             print(f"Email found directly on {website_url}: {email_found}")
             return email_found
 
-        # Step 2: Check common contact paths if no email found on the main page
-        for path in common_contact_paths:
+        # Step 3: Check sitemap contact pages and common paths if no email found on the main page
+        for full_url in contact_urls:
             try:
-                # Construct the full URL for each common path and print it
-                full_url = f"{website_url.rstrip('/')}{path}"
                 print(f"Attempting to visit: {full_url}")
-                search_page.goto(full_url, timeout=15000)
-                search_page.wait_for_load_state("domcontentloaded")  # Wait for page load
-                email_found = extract_email_from_rendered_text(search_page)
+                await search_page.goto(full_url, timeout=15000)
+                await wait_loaded(search_page)  # Wait for page load
+                email_found = await extract_email_from_rendered_text(search_page)
                 if email_found:
                     print(f"Email found on {full_url}: {email_found}")
                     return email_found
             except Exception as e:
                 print(f"Failed to load {full_url}: {e}")
         
-        # Step 3: If no email found, perform a Google search as a fallback
+        # Step 4: If no email found, perform a Google search as a fallback
         print(f"No email found on {website_url}. Performing Google search with site-specific query.")
-        proxy_page = proxy_context.new_page() 
-        email_found = perform_site_specific_google_search(proxy_page, website_url)
-        proxy_page.close()
+        proxy_page = await proxy_context.new_page()
+        email_found = await perform_site_specific_google_search(proxy_page, website_url)
+        await proxy_page.close()
         return email_found
 
     finally:
-        search_page.close()  # Ensure the tab is closed after search
+        await search_page.close()  # Ensure the tab is closed after search
 
 def is_valid_url(url: str) -> bool:
     """Checks if the URL has a valid domain format."""
-    url_pattern = r"^(http:\/\/www\.|https:\/\/www\.|http:\/\/|https:\/\/)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}"
-    return re.match(url_pattern, url) is not None
+    return _URL_RE.match(url) is not None
 
-def scroll_to_load_more(page, required_items, max_scrolls=10):
+async def scroll_to_load_more(page, required_items, max_scrolls=10, idle_ms=3000, retry_ms=20000):
     """
     Scroll the Google Maps results panel to load more listings.
-    Stops scrolling when the required number of items is reached or max scrolls are exhausted.
+    A MutationObserver in the page jumps to the bottom of the panel whenever a new batch of listings
+    has rendered, and stops when the required number of items is reached, max scrolls are exhausted,
+    or nothing new loads within idle_ms plus one retry of retry_ms.
     """
     try:
-        # Locate the results panel using XPath
-        results_panel_xpath = '//div[contains(@aria-label, "Results for")]'
-
-        # Evaluate XPath and locate the results panel
-        results_panel = page.evaluate('''
-            (xpath) => {
-                const panel = document.evaluate(
-                    xpath,
-                    document,
-                    null,
-                    XPathResult.FIRST_ORDERED_NODE_TYPE,
-                    null
-                ).singleNodeValue;
-                return panel ? panel : null;
-            }
-        ''', results_panel_xpath)
+        # Bind the locators once and reuse them
+        results_panel = page.locator(RESULTS_PANEL_CSS).first
+        places = page.locator(PLACES_CSS)
 
-        if not results_panel:
+        if await results_panel.count() == 0:
             print("Results panel not found.")
             return
 
-        previous_count = 0
-        scroll_count = 0
-
-        while scroll_count < max_scrolls:
-            # Count the current number of listings
-            current_count = len(page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all())
-            print(f"Scrolling... Current count: {current_count}")
-
-            # Stop if the required number of items is reached
-            if current_count >= required_items:
-                print(f"Required items ({required_items}) reached after {scroll_count} scrolls.")
-                break
-
-            # Stop if no new results are loaded
-            if current_count == previous_count:
-                print(f"No new results loaded after scroll {scroll_count}. Retrying 1 more time...")
-                page.wait_for_timeout(20000)  # Wait a bit longer and retry
-                current_count = len(page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all())
-                if current_count == previous_count:  # Double-check after retry
-                    print(f"Stopping scroll - no additional results after {scroll_count} scrolls.")
-                    break
-
-            # Update the previous count
-            previous_count = current_count
-
-            # Perform JavaScript scrolling
-            scrolled = page.evaluate('''
-                (xpath) => {
-                    const panel = document.evaluate(
-                        xpath,
-                        document,
-                        null,
-                        XPathResult.FIRST_ORDERED_NODE_TYPE,
-                        null
-                    ).singleNodeValue;
-                    if (panel) {
-                        panel.scrollTop += 2000;
-                        return true;
-                    } else {
-                        return false;
+        await results_panel.evaluate('''
+            (panel, [placesSelector, required, maxScrolls, idleMs, retryMs]) => {
+                const count = () => document.querySelectorAll(placesSelector).length;
+                let lastCount = count();
+                let idleTimer = null;
+                let settleTimer = null;
+                window.__scrollDone = false;
+                window.__scrollCount = 0;
+
+                const finish = () => {
+                    observer.disconnect();
+                    clearTimeout(idleTimer);
+                    clearTimeout(settleTimer);
+                    window.__scrollDone = true;
+                };
+                // Nothing new after idleMs: nudge once more and allow retryMs before the list counts as exhausted
+                const onIdle = (retried) => {
+                    if (retried) {
+                        finish();
+                        return;
                     }
-                }
-            ''', results_panel_xpath)
+                    panel.scrollTop = panel.scrollHeight;
+                    idleTimer = setTimeout(() => onIdle(true), retryMs);
+                };
+                const jump = () => {
+                    if (count() >= required || window.__scrollCount >= maxScrolls) {
+                        finish();
+                        return;
+                    }
+                    const before = panel.scrollTop;
+                    panel.scrollTop = panel.scrollHeight;
+                    if (panel.scrollTop !== before) {
+                        window.__scrollCount += 1;
+                    }
+                    clearTimeout(idleTimer);
+                    idleTimer = setTimeout(() => onIdle(false), idleMs);
+                };
+
+                // New listings arrived: let the batch finish rendering, then jump to the bottom again
+                const observer = new MutationObserver(() => {
+                    const current = count();
+                    if (current !== lastCount) {
+                        lastCount = current;
+                        clearTimeout(settleTimer);
+                        settleTimer = setTimeout(jump, 300);
+                    }
+                });
 
-            if not scrolled:
-                print("Unable to scroll - panel not found or undefined.")
-                break
+                window.__scrollFinish = finish;
+                observer.observe(panel, { childList: true, subtree: true });
+                jump();
+            }
+        ''', [PLACES_CSS, required_items, max_scrolls, idle_ms, retry_ms])
 
-            # Wait for results to load
-            page.wait_for_timeout(3000)  # Adjust wait time as needed
-            scroll_count += 1
+        try:
+            await page.wait_for_function(
+                "() => window.__scrollDone === true", timeout=(max_scrolls + 1) * (idle_ms + retry_ms)
+            )
+        except PlaywrightTimeoutError:
+            print("Timed out waiting for the results panel to finish loading.")
+            # Stop the observer and timers so they don't keep scrolling while listings are clicked
+            await page.evaluate("() => window.__scrollFinish && window.__scrollFinish()")
 
         # Final check: Ensure enough items are loaded
-        final_count = len(page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all())
+        scroll_count = await page.evaluate("() => window.__scrollCount")
+        final_count = await places.count()
         if final_count < required_items:
             print(f"Warning: Only {final_count}/{required_items} listings loaded after {scroll_count} scrolls.")
         else:
@@ -238,11 +518,12 @@ def sanitize_filename(filename: str) -> str:
 # --------------------------------
 # Main Scraping Start
 # --------------------------------
-def scrape_google_maps(proxy_server, proxy_username, proxy_password, user_agent, delay, total, suburb, state):
+async def scrape_google_maps(proxy_server, proxy_username, proxy_password, user_agent, delay, total, suburb, state):
     """
     Scrapes Google Maps for businesses based on suburb and state.
     Constructs a search query as 'boutiques in {suburb}, {state}'.
     """
+    global _IP_CHECKED
     # Validate proxy and user_agent inputs
     if not (proxy_server.startswith("http://") and not proxy_server.startswith("https://")):
         raise ValueError(f"Invalid proxy format: {proxy_server}")
@@ -265,9 +546,11 @@ def scrape_google_maps(proxy_server, proxy_username, proxy_password, user_agent,
 
     
     #actual start of playwright
-    with sync_playwright() as p:
+    async with async_playwright() as p, httpx.AsyncClient(
+        timeout=10, headers={"User-Agent": user_agent}, follow_redirects=True
+    ) as http_client:
         #creating proxy_browser context
-        proxy_browser = p.chromium.launch(
+        proxy_browser = await p.chromium.launch(
             headless=False, 
             proxy={
                 "server": proxy_server,
@@ -279,7 +562,7 @@ def scrape_google_maps(proxy_server, proxy_username, proxy_password, user_agent,
         )
        
         # Non-proxy browser for boutique websites
-        local_browser = p.chromium.launch(
+        local_browser = await p.chromium.launch(
             headless=False,
             args=["--disable-blink-features=AutomationControlled"]
         )
@@ -289,93 +572,134 @@ def scrape_google_maps(proxy_server, proxy_username, proxy_password, user_agent,
             viewport_width = random.randint(1024, 1920)
             viewport_height = random.randint(768, 1080)
             print(f"Using viewport size: {viewport_width}x{viewport_height}")
-            proxy_context = proxy_browser.new_context(
+            proxy_context = await proxy_browser.new_context(
                 viewport={"width": viewport_width, "height": viewport_height},  # Randomized size
                 user_agent=user_agent
             )  # Create a context for multiple tabs
-            page = proxy_context.new_page()  # Original Google Maps page
+            await proxy_context.route("**/*", block_heavy_resources(BLOCKED_RESOURCE_TYPES))
+            page = await proxy_context.new_page()  # Original Google Maps page
 
-            # Check IP address visible to the browser
-            page.goto("https://api64.ipify.org?format=json", timeout=10000)
-            ip = page.inner_text("body")
-            print(f"IP address visible to websites: {ip}")
+            # Local IP context for boutique website interactions, shared by all businesses
+            local_context = await local_browser.new_context(
+                viewport={"width": viewport_width, "height": viewport_height},
+                user_agent=user_agent
+            )
+            await local_context.route("**/*", block_heavy_resources(BLOCKED_LOCAL_RESOURCE_TYPES))
+
+            if DEBUG and not _IP_CHECKED:
+                #test print myip to make sure not use proxy here
+                local_page = await local_context.new_page()
+                await local_page.goto("https://api64.ipify.org?format=json", timeout=10000)
+                local_ip = await local_page.inner_text("body")
+                print(f"Local browser IP address: {local_ip}")
+                await local_page.close()
 
+                # Check IP address visible to the browser
+                await page.goto("https://api64.ipify.org?format=json", timeout=10000)
+                ip = await page.inner_text("body")
+                print(f"IP address visible to websites: {ip}")
+                _IP_CHECKED = True
 
-            page.goto("https://www.google.com/maps", timeout=60000)
+
+            await page.goto("https://www.google.com/maps", timeout=60000)
             #page.goto("https://arh.antoinevastel.com/bots/areyouheadless", timeout=60000)
-            page.wait_for_timeout(delay * 1000)
+            await page.wait_for_timeout(delay * 1000)
             
 
             # Loop over each search term
 
-            page.locator('//input[@id="searchboxinput"]').fill(search_query)
-            page.wait_for_timeout(3000)
-            page.keyboard.press("Enter")
-            page.wait_for_selector('//div[contains(@aria-label, "Results for")]', timeout=30000) #wait at most 15k;can be quicker
+            await page.locator('//input[@id="searchboxinput"]').fill(search_query)
+            await page.wait_for_timeout(3000)
+            await page.keyboard.press("Enter")
+            await page.wait_for_selector(RESULTS_PANEL_CSS, timeout=30000) #wait at most 15k;can be quicker
 
 
 
-            scroll_to_load_more(page, total)  # Ensure all listings are loaded
-            page.hover('//a[contains(@href, "https://www.google.com/maps/place")]')
-            listings = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all()[:total]
+            await scroll_to_load_more(page, total)  # Ensure all listings are loaded
+            places = page.locator(PLACES_CSS)
+            await places.first.hover()
+            listings = (await places.all())[:total]
             listings = [listing.locator("xpath=..") for listing in listings]
             business_list = BusinessList()
 
             # --------------------------------
             # Extract Business Details
             # --------------------------------
+            # Stays sequential: the Maps detail panel is replaced on every click
+            previous_name = ""
             for listing in listings:
+                business = Business()
                 try:
-                    listing.click()
-                    page.wait_for_timeout(5000)
-
-                    business = Business()
-                    business.name = page.locator('//h1[contains(@Class, "DUwDvf lfPIob")]').inner_text() or ""
-                    business.address = page.locator('//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]').inner_text() or ""
-                    business.website = page.locator('//a[@data-item-id="authority"]//div[contains(@class, "fontBodyMedium")]').inner_text() or ""
-                    business.phone_number = page.locator('//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]').inner_text() or ""
+                    previous_url = page.url
+                    await listing.click()
+                    # Wait for the panel title and URL (for the coordinates) to move off the previous place.
+                    # Re-clicking the open place (e.g. a sponsored duplicate) changes neither, so a timeout is not fatal.
+                    try:
+                        await page.wait_for_function('''
+                            ([previousName, previousUrl]) => {
+                                const title = document.querySelector('h1.DUwDvf');
+                                return !!title && title.innerText !== previousName && location.href !== previousUrl;
+                            }
+                        ''', arg=[previous_name, previous_url], timeout=8000)
+                    except PlaywrightTimeoutError:
+                        print(f"Detail panel still shows {previous_name or 'the previous place'}, reading it anyway.")
+                    await page.wait_for_selector('h1.DUwDvf', state="visible", timeout=8000)
+
+                    # Read all panel fields in a single round-trip to the browser
+                    data = await page.evaluate('''
+                        () => {
+                            const q = s => document.querySelector(s)?.innerText || '';
+                            return {
+                                name: q('h1.DUwDvf.lfPIob'),
+                                address: q('button[data-item-id="address"] .fontBodyMedium'),
+                                website: q('a[data-item-id="authority"] .fontBodyMedium'),
+                                phone: q('button[data-item-id^="phone:tel:"] .fontBodyMedium')
+                            };
+                        }
+                    ''')
+                    business.name = data["name"]
+                    business.address = data["address"]
+                    business.website = data["website"]
+                    business.phone_number = data["phone"]
+                    previous_name = business.name
                     business.latitude, business.longitude = extract_coordinates_from_url(page.url)
 
-                    # --------------------------------
-                    # Website and Email Extraction
-                    # --------------------------------
                     if business.website:
                         # Add protocol if missing
                         if not business.website.startswith(('http://', 'https://')):
                             business.website = f"https://{business.website}"
                         
                         print(f"Extracted website URL: {business.website}")
-
-                        # Validate URL format and attempt to find email
-                        if is_valid_url(business.website):
-                            # Create a local IP context for boutique website interactions
-                            local_context = local_browser.new_context(
-                                viewport={"width": viewport_width, "height": viewport_height},
-                                user_agent=user_agent
-                            )
-                            #test print myip to make sure not use proxy here
-                            local_page = local_context.new_page()
-                            local_page.goto("https://api64.ipify.org?format=json", timeout=10000)
-                            local_ip = local_page.inner_text("body")
-                            print(f"Local browser IP address: {local_ip}")
-                            #pass non-proxy context to below function to crawl non-google-site.
-                            business.email = search_email_on_website(local_context, business.website,proxy_context)  # pass both context
-                            local_context.close()  # Close the context after use
-                        else:
+                        if not is_valid_url(business.website):
                             print(f"Invalid URL skipped: {business.website}")
-                    
+
                 except Exception as e:
                     print(f"Error extracting business details: {e}")
                 finally:
                     business_list.business_list.append(business)                    
 
+            # --------------------------------
+            # Website and Email Extraction
+            # --------------------------------
+            semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+            async def bounded(business):
+                async with semaphore:
+                    #pass non-proxy context to below function to crawl non-google-site.
+                    business.email = await search_email_on_website(local_context, business.website, proxy_context, http_client)  # pass both context
+
+            tasks = [bounded(business) for business in business_list.business_list
+                     if business.website and is_valid_url(business.website)]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Error extracting email: {result}")
+
             # --------------------------------
             # Save Results
             # --------------------------------
             business_list.save_to_excel(sanitize_filename(output_file_suffix))
             business_list.save_to_csv(sanitize_filename(output_file_suffix))
         finally:
-            proxy_browser.close()
-            local_browser.close()
-
-
+            await proxy_browser.close()
+            await local_browser.close()
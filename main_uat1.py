@@ -3,6 +3,12 @@ import json
 import requests
 from escrape import scrape_google_maps
 import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Number of suburbs scraped in parallel; keep within the proxy plan's concurrency limit
+MAX_WORKERS = 4
 
 # Load ProxyScrape credentials from config.json
 def load_credentials(file_path="config.json"):
@@ -20,20 +26,8 @@ def load_credentials(file_path="config.json"):
         print(f"Error loading credentials: {e}")
         exit(1)
 
-# Load credentials
-credentials = load_credentials()
-
-# Construct proxy details
-username = credentials["username"]
-password = credentials["password"]
-proxy = credentials["proxy"]
-proxy_auth = f"{username}:{password}@{proxy}"
-proxies = {
-    "http": f"http://{proxy_auth}"
-}
-
 # Test the proxy
-def test_proxy():
+def test_proxy(proxies):
     """
     Test if the proxy is working by sending a request to ip-api.com.
     """
@@ -46,30 +40,12 @@ def test_proxy():
         print(f"Error verifying proxy: {e}")
         exit(1)
 
-test_proxy()  # Verify proxy before proceeding
-
-# Load user agents from file
-with open("user_agents_desktop.txt", "r") as f:
-    user_agents = [line.strip() for line in f.readlines() if line.strip()]
-
-# Load suburbs and states from file
-with open("suburbs.txt", "r") as f:
-    suburbs = [line.strip() for line in f.readlines() if line.strip()]
-
-# Check if user agents and suburbs are loaded
-if not user_agents:
-    print("No valid user agents found. Exiting.")
-    exit(1)
-
-if not suburbs:
-    print("No valid suburbs found. Exiting.")
-    exit(1)
-
-# Loop through suburbs
-for suburb in suburbs:
-
+def run_one(suburb, credentials, user_agents):
+    """
+    Scrape a single "suburb, state, postcode" entry. Runs inside a worker process.
+    """
     start_time = time.time() #start the timer for complete a suburb
-    user_agent = random.choice(user_agents)  # Random user agent
+    user_agent = random.choice(user_agents)  # Random user agent per worker run; viewport is randomized in scrape_google_maps
     delay = random.randint(2, 5)  # Example random delay
     total = 40  # Number of businesses to scrape (default for now)
 
@@ -82,19 +58,19 @@ for suburb in suburbs:
 
             # Call scrape_google_maps function
             #scrape_google_maps(proxies["http"], user_agent, delay, total, suburb_name, state)
-            scrape_google_maps(
-                proxy_server=f"http://{proxy}", 
-                proxy_username=username, 
-                proxy_password=password, 
-                user_agent=user_agent, 
-                delay=delay, 
-                total = total, 
-                suburb=suburb_name, 
+            asyncio.run(scrape_google_maps(
+                proxy_server=f"http://{credentials['proxy']}",
+                proxy_username=credentials["username"],
+                proxy_password=credentials["password"],
+                user_agent=user_agent,
+                delay=delay,
+                total = total,
+                suburb=suburb_name,
                 state=state
-                )
+                ))
         else:
             print(f"Invalid suburb format: {suburb}. Skipping.")
-            continue
+            return
     else:
         print(f"Invalid suburb format: {suburb}. Skipping.")
     # Record the end time
@@ -102,4 +78,40 @@ for suburb in suburbs:
 
     # Calculate and print the time taken
     elapsed_time = end_time - start_time
-    print(f"Completed processing for suburb: {suburb} in {elapsed_time:.2f} seconds.")
\ No newline at end of file
+    print(f"Completed processing for suburb: {suburb} in {elapsed_time:.2f} seconds.")
+
+if __name__ == "__main__":
+    # Load credentials
+    credentials = load_credentials()
+
+    # Construct proxy details
+    username = credentials["username"]
+    password = credentials["password"]
+    proxy = credentials["proxy"]
+    proxy_auth = f"{username}:{password}@{proxy}"
+    proxies = {
+        "http": f"http://{proxy_auth}"
+    }
+
+    test_proxy(proxies)  # Verify proxy before proceeding
+
+    # Load user agents from file
+    with open("user_agents_desktop.txt", "r") as f:
+        user_agents = [line.strip() for line in f.readlines() if line.strip()]
+
+    # Load suburbs and states from file
+    with open("suburbs.txt", "r") as f:
+        suburbs = [line.strip() for line in f.readlines() if line.strip()]
+
+    # Check if user agents and suburbs are loaded
+    if not user_agents:
+        print("No valid user agents found. Exiting.")
+        exit(1)
+
+    if not suburbs:
+        print("No valid suburbs found. Exiting.")
+        exit(1)
+
+    # Each suburb writes its own output/<suburb>_<state> files, so workers never collide
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(partial(run_one, credentials=credentials, user_agents=user_agents), suburbs))